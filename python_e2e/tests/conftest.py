@@ -0,0 +1,230 @@
+import functools
+import os
+import re
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+# abspath instead of Path.resolve(): no realpath() walk at import
+_ROOT_STR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROOT = Path(_ROOT_STR)
+PROJECT_ROOT = ROOT.parent
+CONFIGS_DIR = ROOT / "configs"
+# subprocess only takes the posix_spawn fast path when cwd is None (and
+# close_fds=False), so skip cwd when pytest already runs from ROOT
+SPAWN_CWD = None if os.getcwd() == _ROOT_STR else ROOT
+# [tool.python_proto_importer] and its sub-tables, e.g. [...verify]
+TOOL_TABLE_RE = re.compile(r"\[tool\.python_proto_importer[.\]]")
+# Configs built at once by each invocation of the binary (--jobs); xdist
+# workers build side by side, so they split the CPUs between them
+JOBS = max(
+    1, (os.cpu_count() or 1) // int(os.environ.get("PYTEST_XDIST_WORKER_COUNT", "1"))
+)
+
+
+def resolve_configs(names: list[str]) -> dict[str, Path]:
+    """Map config names to their files in CONFIGS_DIR, checked with one directory scan
+
+    Called at module import, so a missing config fails collection instead of
+    being stat'd again by every test.
+    """
+    with os.scandir(CONFIGS_DIR) as entries:
+        present = {entry.name for entry in entries if entry.is_file()}
+    missing = [name for name in names if f"{name}.toml" not in present]
+    assert not missing, f"Config files not found in {CONFIGS_DIR}: {missing}"
+    return {name: CONFIGS_DIR / f"{name}.toml" for name in names}
+
+
+@functools.lru_cache(maxsize=None)
+def _package_markers(rel_dir: str) -> tuple[str, ...]:
+    """__init__.py files found in ROOT along rel_dir and its parents, outermost first
+
+    Cached per directory, so configs whose outputs share parents (e.g.
+    generated/) look each marker up only once.
+    """
+    if not rel_dir:
+        return ()
+    markers = _package_markers(os.path.dirname(rel_dir))
+    marker = os.path.join(rel_dir, "__init__.py")
+    if os.path.isfile(os.path.join(_ROOT_STR, marker)):
+        markers += (marker,)
+    return markers
+
+
+def prepare_build(config_path: Path, out: str, out_root: Path) -> tuple[Path, Path]:
+    """Redirect a config's output under out_root; return (config copy, gen_path)
+
+    The output keeps its layout relative to ROOT, and the parent packages'
+    __init__.py files are copied along, so the tool resolves the same package
+    name (e.g. test_package.generated) as it would for an output in ROOT.
+    """
+    gen_path = out_root / out
+    for marker in _package_markers(os.path.dirname(out)):
+        (out_root / marker).parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(ROOT / marker, out_root / marker)
+
+    # Rewrite the out dir and paths below it in the tool's tables, so the
+    # verify commands (mypy/pyright paths) follow the output as well. Sibling
+    # dirs sharing the prefix (e.g. generated/full_v2) and other tools'
+    # settings (mypy/pyright excludes) keep their values.
+    out_value = re.compile(rf'"{re.escape(out)}(?=["/])')
+    new_value = f'"{gen_path.as_posix()}'
+    lines = []
+    in_tool_table = False
+    for line in config_path.read_text(encoding="utf-8").splitlines(keepends=True):
+        if line.startswith("["):
+            in_tool_table = TOOL_TABLE_RE.match(line) is not None
+        if in_tool_table:
+            line = out_value.sub(lambda _: new_value, line)
+        lines.append(line)
+    tmp_config = out_root / "configs" / config_path.name
+    tmp_config.parent.mkdir(exist_ok=True)
+    tmp_config.write_text("".join(lines), encoding="utf-8")
+    return tmp_config, gen_path
+
+
+def snapshot(gen_path: Path) -> set[str]:
+    """Collect every path under gen_path (relative, '/'-separated) in one walk"""
+    # One directory traversal instead of a stat() per asserted path
+    return {p.relative_to(gen_path).as_posix() for p in gen_path.rglob("*")}
+
+
+def build_many(
+    bin_path: Path,
+    builds: dict[str, tuple[Path, Path]],
+    no_verify: bool = False,
+    jobs: int = JOBS,
+) -> dict[str, subprocess.CompletedProcess]:
+    """Build several configs with a single invocation of the binary
+
+    builds maps a name to its (config_path, gen_path); up to jobs configs are
+    built concurrently. If the combined run fails, each config is rebuilt
+    separately (again up to jobs at a time) so each result carries its own
+    exit code; if every config then builds on its own, all of them report the
+    combined run's failure. stdout/stderr are only kept (as text) for a failed build.
+    """
+    if not builds:
+        return {}
+
+    cmd = [str(bin_path), "build", "--jobs", str(jobs)]
+    for config_path, _ in builds.values():
+        cmd += ["--pyproject", str(config_path)]
+    if no_verify:
+        cmd.append("--no-verify")
+
+    # A failing batch is rebuilt per config below, so only its stderr is
+    # kept, for a failure the single builds don't reproduce. Single builds
+    # keep raw bytes, decoded only when they fail.
+    batch = len(builds) > 1
+    result = subprocess.run(
+        cmd,
+        cwd=SPAWN_CWD,
+        stdout=subprocess.DEVNULL if batch else subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        close_fds=False,
+    )
+    if result.returncode != 0 and not batch:
+        # Not printed here: this runs in a module fixture, so the tests put
+        # the output in their failure messages instead
+        result.stdout = result.stdout.decode(errors="replace")
+        result.stderr = result.stderr.decode(errors="replace")
+
+    if result.returncode != 0 and batch:
+        # The binary stops at the first failing config; find out which ones
+        # fail, running up to jobs single builds side by side
+        results = {}
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            futures = [
+                pool.submit(build_many, bin_path, {name: build}, no_verify, jobs)
+                for name, build in builds.items()
+            ]
+            for future in futures:
+                results.update(future.result())
+        if any(rerun.returncode != 0 for rerun in results.values()):
+            return results
+        # Only the combined run fails (e.g. configs racing each other), so
+        # every config in it reports that failure
+        result.stdout = ""
+        result.stderr = (
+            "Combined build failed, but each config builds on its own:\n"
+            + result.stderr.decode(errors="replace")
+        )
+
+    return dict.fromkeys(builds, result)
+
+
+def build_configs(
+    bin_path: Path,
+    out_root: Path,
+    configs: list[tuple[Path, dict]],
+    jobs: int = JOBS,
+) -> dict[str, tuple[subprocess.CompletedProcess, Path]]:
+    """Build (config_path, expected) entries with outputs redirected under out_root
+
+    Configs run in one invocation per --no-verify value (expected["no_verify"]).
+    Returns {config_name: (result, gen_path)}, keyed by the config file's stem.
+    """
+    results = {}
+    # --no-verify applies to the whole invocation, so batch per flag value
+    for no_verify in (False, True):
+        builds = {
+            config_path.stem: prepare_build(config_path, expected["out"], out_root)
+            for config_path, expected in configs
+            if expected.get("no_verify", False) == no_verify
+        }
+        for name, result in build_many(bin_path, builds, no_verify, jobs).items():
+            results[name] = (result, builds[name][1])
+    return results
+
+
+@pytest.fixture(scope="module")
+def all_builds(request, bin_path, tmp_path_factory):
+    """Build every entry the requesting module's selected tests use, once
+
+    Entries are the (config_path, expected) build_result parameters of the
+    module's collected items, so deselecting tests (e.g. with -k) skips their
+    builds too. Returns {config_name: (result, gen_path)}. Outputs go to a
+    pytest-managed dir, so nothing needs cleaning up and xdist workers never
+    share a tree.
+    """
+    configs = {}
+    for item in request.session.items:
+        callspec = getattr(item, "callspec", None)
+        if getattr(item, "module", None) is not request.module or callspec is None:
+            continue
+        if "build_result" in callspec.params:
+            config_path, expected = callspec.params["build_result"]
+            configs.setdefault(config_path, (config_path, expected))
+    return build_configs(
+        bin_path, tmp_path_factory.mktemp("builds"), list(configs.values())
+    )
+
+
+@pytest.fixture
+def build_result(request, all_builds):
+    """Build outcome for a (config_path, expected) entry given via indirect parametrize
+
+    Returns (config_name, expected, result, gen_path). The build itself ran once
+    for the whole module in all_builds.
+    """
+    config_path, expected = request.param
+    config_name = config_path.stem
+    result, gen_path = all_builds[config_name]
+    return config_name, expected, result, gen_path
+
+
+@pytest.fixture(scope="session")
+def bin_path() -> Path:
+    """Build the release binary once per session and return its path"""
+    # cargo is a no-op when the binary is already up to date
+    subprocess.run(
+        ["cargo", "build", "--release", "-p", "python-proto-importer"],
+        cwd=PROJECT_ROOT,
+        check=True,
+    )
+    # Native binary: run it directly rather than through `uv run`; the tool puts
+    # the configured python_exe's bin dir on PATH for protoc plugins itself
+    return PROJECT_ROOT / "target" / "release" / "python-proto-importer"
@@ -1,124 +1,17 @@
-import shutil
-import subprocess
+import functools
+import os
+import re
 from pathlib import Path
 
 import pytest
 
-HERE = Path(__file__).resolve().parent.parent
-ROOT = HERE
-# Use relative path from python_e2e to project root
-PROJECT_ROOT = HERE.parent
-BIN = PROJECT_ROOT / "target" / "release" / "python-proto-importer"
+from conftest import ROOT, build_configs, resolve_configs, snapshot
 
+DEFAULT_OUT = "src/proto_importer_e2e/generated"
+# Generated module whose contents the tests inspect, relative to the output dir
+PAYMENT_PB2 = "proto/payment/payment_pb2.py"
 
-def clean_generated_dirs():
-    """Clean all possible generated directories"""
-    dirs_to_clean = [
-        ROOT / "generated",
-        ROOT / "generated_alt",
-        ROOT / "src" / "proto_importer_e2e" / "generated",
-        ROOT / "test_package" / "generated",
-    ]
-    for dir_path in dirs_to_clean:
-        if dir_path.exists():
-            shutil.rmtree(dir_path)
-
-
-@pytest.fixture(autouse=True)
-def cleanup():
-    """Clean generated files before and after each test"""
-    clean_generated_dirs()
-    yield
-    clean_generated_dirs()
-
-
-def run_build(config_path: Path) -> subprocess.CompletedProcess:
-    """Run the build command with given config"""
-    result = subprocess.run(
-        ["uv", "run", str(BIN), "build", "--pyproject", str(config_path)],
-        cwd=ROOT,
-        capture_output=True,
-        text=True,
-    )
-    print(result.stdout)
-    print(result.stderr)
-    return result
-
-
-def verify_basic_structure(gen_path: Path, has_init: bool = True):
-    """Verify basic generated file structure"""
-    # Payment service files
-    assert (gen_path / "proto" / "payment" / "payment_pb2.py").exists()
-    assert (gen_path / "proto" / "payment" / "payment_pb2_grpc.py").exists()
-    assert (gen_path / "proto" / "payment" / "types_pb2.py").exists()
-    assert (gen_path / "proto" / "payment" / "types_pb2_grpc.py").exists()
-    
-    # User service files
-    assert (gen_path / "proto" / "user" / "user_pb2.py").exists()
-    assert (gen_path / "proto" / "user" / "user_pb2_grpc.py").exists()
-    assert (gen_path / "proto" / "user" / "types_pb2.py").exists()
-    assert (gen_path / "proto" / "user" / "types_pb2_grpc.py").exists()
-    
-    # Inventory service files
-    assert (gen_path / "proto" / "inventory" / "inventory_pb2.py").exists()
-    assert (gen_path / "proto" / "inventory" / "inventory_pb2_grpc.py").exists()
-    
-    # Check __init__.py files based on config
-    if has_init:
-        assert (gen_path / "proto" / "__init__.py").exists()
-        assert (gen_path / "proto" / "payment" / "__init__.py").exists()
-        assert (gen_path / "proto" / "user" / "__init__.py").exists()
-        assert (gen_path / "proto" / "inventory" / "__init__.py").exists()
-        assert (gen_path / "__init__.py").exists()
-    else:
-        assert not (gen_path / "proto" / "__init__.py").exists()
-        assert not (gen_path / "proto" / "payment" / "__init__.py").exists()
-
-
-def verify_type_stubs(gen_path: Path, has_mypy: bool, has_mypy_grpc: bool):
-    """Verify type stub files based on config"""
-    if has_mypy:
-        # Check for .pyi files
-        assert (gen_path / "proto" / "payment" / "payment_pb2.pyi").exists()
-        assert (gen_path / "proto" / "payment" / "types_pb2.pyi").exists()
-        assert (gen_path / "proto" / "user" / "user_pb2.pyi").exists()
-        assert (gen_path / "proto" / "user" / "types_pb2.pyi").exists()
-        assert (gen_path / "proto" / "inventory" / "inventory_pb2.pyi").exists()
-    else:
-        # No .pyi files should be generated
-        assert not (gen_path / "proto" / "payment" / "payment_pb2.pyi").exists()
-    
-    if has_mypy_grpc:
-        # Check for grpc .pyi files  
-        assert (gen_path / "proto" / "payment" / "payment_pb2_grpc.pyi").exists()
-        assert (gen_path / "proto" / "user" / "user_pb2_grpc.pyi").exists()
-        assert (gen_path / "proto" / "inventory" / "inventory_pb2_grpc.pyi").exists()
-    else:
-        # No grpc .pyi files
-        assert not (gen_path / "proto" / "payment" / "payment_pb2_grpc.pyi").exists()
-
-
-def verify_pyright_header(gen_path: Path, has_header: bool):
-    """Check if pyright header is present in generated files"""
-    test_file = gen_path / "proto" / "payment" / "payment_pb2.py"
-    if test_file.exists():
-        content = test_file.read_text()
-        has_pyright = "# pyright:" in content
-        assert has_pyright == has_header
-
-
-def verify_relative_import_rewrite(gen_path: Path):
-    """Verify that absolute imports were rewritten to relative imports."""
-    target = gen_path / "proto" / "payment" / "payment_pb2.py"
-    assert target.exists(), f"{target} not found"
-    content = target.read_text(encoding="utf-8")
-    # should import sibling module relatively
-    assert "from . import types_pb2" in content
-    # absolute form should not remain
-    assert "import proto.payment.types_pb2" not in content
-
-
-@pytest.mark.parametrize("config_name,expected", [
+CONFIGS = [
     ("config_minimal", {
         "out": "generated/minimal",
         "has_mypy": False,
@@ -168,69 +61,219 @@ def verify_relative_import_rewrite(gen_path: Path):
         "has_init": True,
         "has_pyright_header": False,
     }),
-])
-def test_with_config(config_name, expected):
-    """Test build with different configuration files"""
-    config_path = ROOT / "configs" / f"{config_name}.toml"
-    assert config_path.exists(), f"Config file {config_path} not found"
+]
+
+# Config files resolved (and checked to exist) once, at collection
+CONFIG_PATHS = resolve_configs([name for name, _ in CONFIGS])
+PARAMS = [(CONFIG_PATHS[name], expected) for name, expected in CONFIGS]
+# The default config, checked by test_build_and_verify
+DEFAULT_CONFIG = ROOT / "pyproject.toml"
+assert os.path.isfile(DEFAULT_CONFIG), f"Default config not found: {DEFAULT_CONFIG}"
+DEFAULT_PARAMS = [(DEFAULT_CONFIG, {"out": DEFAULT_OUT})]
+
+
+# Both forms in one pass: the rewritten relative import and the original absolute one
+# Bytes patterns: generated files are searched without decoding them
+TYPES_IMPORT_RE = re.compile(
+    rb"(?P<rel>from \. import types_pb2)|(?P<abs>import proto\.payment\.types_pb2)"
+)
+PYRIGHT_HEADER = b"# pyright:"
+
+
+@functools.lru_cache(maxsize=256)
+def _read(path_str: str, mtime_ns: int, size: int) -> bytes:
+    """Read a generated file; keyed on its stat so rebuilt files are re-read"""
+    return Path(path_str).read_bytes()
+
+
+def read_generated(path: str) -> bytes:
+    """Return the raw contents of a generated file, reusing earlier reads"""
+    st = os.stat(path)
+    return _read(path, st.st_mtime_ns, st.st_size)
+
+
+def types_import_hits(content: bytes) -> set[str]:
+    """Return which of the "rel"/"abs" types_pb2 imports appear in content"""
+    return {m.lastgroup for m in TYPES_IMPORT_RE.finditer(content)}
+
+
+def verify_basic_structure(snap: set[str], has_init: bool = True):
+    """Verify basic generated file structure"""
+    # Payment service files
+    assert "proto/payment/payment_pb2.py" in snap
+    assert "proto/payment/payment_pb2_grpc.py" in snap
+    assert "proto/payment/types_pb2.py" in snap
+    assert "proto/payment/types_pb2_grpc.py" in snap
+    
+    # User service files
+    assert "proto/user/user_pb2.py" in snap
+    assert "proto/user/user_pb2_grpc.py" in snap
+    assert "proto/user/types_pb2.py" in snap
+    assert "proto/user/types_pb2_grpc.py" in snap
     
-    # Run build
-    result = run_build(config_path)
-    assert result.returncode == 0, f"Build failed for {config_name}"
+    # Inventory service files
+    assert "proto/inventory/inventory_pb2.py" in snap
+    assert "proto/inventory/inventory_pb2_grpc.py" in snap
+    
+    # Check __init__.py files based on config
+    if has_init:
+        assert "proto/__init__.py" in snap
+        assert "proto/payment/__init__.py" in snap
+        assert "proto/user/__init__.py" in snap
+        assert "proto/inventory/__init__.py" in snap
+        assert "__init__.py" in snap
+    else:
+        assert "proto/__init__.py" not in snap
+        assert "proto/payment/__init__.py" not in snap
+
+
+def verify_type_stubs(snap: set[str], has_mypy: bool, has_mypy_grpc: bool):
+    """Verify type stub files based on config"""
+    if has_mypy:
+        # Check for .pyi files
+        assert "proto/payment/payment_pb2.pyi" in snap
+        assert "proto/payment/types_pb2.pyi" in snap
+        assert "proto/user/user_pb2.pyi" in snap
+        assert "proto/user/types_pb2.pyi" in snap
+        assert "proto/inventory/inventory_pb2.pyi" in snap
+    else:
+        # No .pyi files should be generated
+        assert "proto/payment/payment_pb2.pyi" not in snap
+    
+    if has_mypy_grpc:
+        # Check for grpc .pyi files  
+        assert "proto/payment/payment_pb2_grpc.pyi" in snap
+        assert "proto/user/user_pb2_grpc.pyi" in snap
+        assert "proto/inventory/inventory_pb2_grpc.pyi" in snap
+    else:
+        # No grpc .pyi files
+        assert "proto/payment/payment_pb2_grpc.pyi" not in snap
+
+
+def verify_pyright_header(gen_path: Path, snap: set[str], has_header: bool):
+    """Check if pyright header is present in generated files"""
+    if PAYMENT_PB2 in snap:
+        content = read_generated(os.path.join(gen_path, PAYMENT_PB2))
+        has_pyright = PYRIGHT_HEADER in content
+        assert has_pyright == has_header
+
+
+def verify_relative_import_rewrite(gen_path: Path, snap: set[str]):
+    """Verify that absolute imports were rewritten to relative imports."""
+    target = os.path.join(gen_path, PAYMENT_PB2)
+    assert PAYMENT_PB2 in snap, f"{target} not found"
+    hits = types_import_hits(read_generated(target))
+    # should import sibling module relatively
+    assert "rel" in hits
+    # absolute form should not remain
+    assert "abs" not in hits
+
+
+@pytest.mark.parametrize(
+    "build_result", PARAMS, ids=list(CONFIG_PATHS), indirect=True
+)
+def test_with_config(build_result):
+    """Test build with different configuration files"""
+    config_name, expected, result, gen_path = build_result
+    # The build ran in the module fixture, so report its output here
+    assert result.returncode == 0, (
+        f"Build failed for {config_name} with exit code {result.returncode}\n"
+        f"STDOUT:\n{result.stdout}\nSTDERR:\n{result.stderr}"
+    )
     
     # Verify output directory
-    gen_path = ROOT / expected["out"]
-    assert gen_path.exists(), f"Output directory {gen_path} not created"
+    assert os.path.isdir(gen_path), f"Output directory {gen_path} not created"
     
     # Verify generated files
-    verify_basic_structure(gen_path, expected["has_init"])
-    verify_type_stubs(gen_path, expected["has_mypy"], expected["has_mypy_grpc"])
-    verify_pyright_header(gen_path, expected["has_pyright_header"])
-    verify_relative_import_rewrite(gen_path)
+    snap = snapshot(gen_path)
+    verify_basic_structure(snap, expected["has_init"])
+    verify_type_stubs(snap, expected["has_mypy"], expected["has_mypy_grpc"])
+    verify_pyright_header(gen_path, snap, expected["has_pyright_header"])
+    verify_relative_import_rewrite(gen_path, snap)
 
 
-def test_build_and_verify():
+@pytest.mark.parametrize(
+    "build_result", DEFAULT_PARAMS, ids=["pyproject"], indirect=True
+)
+def test_build_and_verify(build_result):
     """Original test with default pyproject.toml for backward compatibility"""
-    # build
-    cfg = ROOT / "pyproject.toml"
-    assert cfg.exists()
-    result = subprocess.run(
-        ["uv", "run", str(BIN), "build", "--pyproject", str(cfg)],
-        cwd=ROOT,
-        capture_output=True,
-        text=True,
+    _, _, result, gen = build_result
+    assert result.returncode == 0, (
+        f"Build failed for pyproject.toml with exit code {result.returncode}\n"
+        f"STDOUT:\n{result.stdout}\nSTDERR:\n{result.stderr}"
     )
-    print(result.stdout)
-    print(result.stderr)
-    assert result.returncode == 0
 
     # verify generated files structure
-    gen = ROOT / "src" / "proto_importer_e2e" / "generated"
+    snap = snapshot(gen)
 
     # Payment service files
-    assert (gen / "proto" / "payment" / "payment_pb2.py").exists()
-    assert (gen / "proto" / "payment" / "payment_pb2_grpc.py").exists()
-    assert (gen / "proto" / "payment" / "types_pb2.py").exists()
-    assert (gen / "proto" / "payment" / "types_pb2_grpc.py").exists()
-    assert (gen / "proto" / "payment" / "__init__.py").exists()
+    assert "proto/payment/payment_pb2.py" in snap
+    assert "proto/payment/payment_pb2_grpc.py" in snap
+    assert "proto/payment/types_pb2.py" in snap
+    assert "proto/payment/types_pb2_grpc.py" in snap
+    assert "proto/payment/__init__.py" in snap
 
     # User service files
-    assert (gen / "proto" / "user" / "user_pb2.py").exists()
-    assert (gen / "proto" / "user" / "user_pb2_grpc.py").exists()
-    assert (gen / "proto" / "user" / "types_pb2.py").exists()
-    assert (gen / "proto" / "user" / "types_pb2_grpc.py").exists()
-    assert (gen / "proto" / "user" / "__init__.py").exists()
+    assert "proto/user/user_pb2.py" in snap
+    assert "proto/user/user_pb2_grpc.py" in snap
+    assert "proto/user/types_pb2.py" in snap
+    assert "proto/user/types_pb2_grpc.py" in snap
+    assert "proto/user/__init__.py" in snap
 
     # Inventory service files
-    assert (gen / "proto" / "inventory" / "inventory_pb2.py").exists()
-    assert (gen / "proto" / "inventory" / "inventory_pb2_grpc.py").exists()
-    assert (gen / "proto" / "inventory" / "__init__.py").exists()
+    assert "proto/inventory/inventory_pb2.py" in snap
+    assert "proto/inventory/inventory_pb2_grpc.py" in snap
+    assert "proto/inventory/__init__.py" in snap
 
     # Root init files
-    assert (gen / "proto" / "__init__.py").exists()
-    assert (gen / "__init__.py").exists()
+    assert "proto/__init__.py" in snap
+    assert "__init__.py" in snap
 
     # relative import rewrite example: payment_pb2 should import types_pb2 relatively
-    payment_py = (gen / "proto" / "payment" / "payment_pb2.py").read_text(encoding="utf-8")
-    assert "from . import types_pb2" in payment_py
-    assert "import proto.payment.types_pb2" not in payment_py
\ No newline at end of file
+    hits = types_import_hits(read_generated(os.path.join(gen, PAYMENT_PB2)))
+    assert "rel" in hits
+    assert "abs" not in hits
+
+
+def tree_contents(gen_path: Path) -> dict[str, bytes]:
+    """Map every file under gen_path (relative, '/'-separated) to its bytes"""
+    return {
+        p.relative_to(gen_path).as_posix(): p.read_bytes()
+        for p in gen_path.rglob("*")
+        if p.is_file()
+    }
+
+
+# A few configs differing in layout and postprocessing, built side by side
+SERIAL_CHECK_CONFIGS = ["config_minimal", "config_full", "config_no_package"]
+
+
+def test_serial_build_matches_parallel(bin_path, tmp_path_factory):
+    """Building the configs one at a time (--jobs 1) yields the same files and contents"""
+    # Only the generated trees are compared, so skip the verify step
+    expected = dict(CONFIGS)
+    configs = [
+        (CONFIG_PATHS[name], {**expected[name], "no_verify": True})
+        for name in SERIAL_CHECK_CONFIGS
+    ]
+    # One worker per config, so the parallel path runs even on a single CPU
+    parallel_results = build_configs(
+        bin_path, tmp_path_factory.mktemp("parallel_builds"), configs, jobs=len(configs)
+    )
+    serial_results = build_configs(
+        bin_path, tmp_path_factory.mktemp("serial_builds"), configs, jobs=1
+    )
+
+    for name, (result, gen_path) in serial_results.items():
+        assert result.returncode == 0, (
+            f"Serial build failed for {name}\nSTDERR:\n{result.stderr}"
+        )
+        parallel_result, parallel_gen = parallel_results[name]
+        assert parallel_result.returncode == 0, (
+            f"Parallel build failed for {name}\nSTDERR:\n{parallel_result.stderr}"
+        )
+        assert snapshot(gen_path) == snapshot(parallel_gen), f"Output layout differs for {name}"
+        # Same names are not enough: compare contents too (e.g. interleaved rewrites)
+        serial, parallel = tree_contents(gen_path), tree_contents(parallel_gen)
+        differing = sorted(path for path in serial if serial[path] != parallel[path])
+        assert not differing, f"File contents differ for {name}: {differing}"
@@ -23,12 +23,16 @@ pub struct Cli {
 pub enum Commands {
     Doctor,
     Build {
+        /// Config file to build; repeat to build several configs in one run
         #[arg(long)]
-        pyproject: Option<String>,
+        pyproject: Vec<String>,
         #[arg(long)]
         no_verify: bool,
         #[arg(long)]
         postprocess_only: bool,
+        /// Number of configs to build at the same time [default: $PROTO_IMPORTER_JOBS or 1]
+        #[arg(long)]
+        jobs: Option<usize>,
     },
     Check {
         #[arg(long)]
@@ -56,6 +60,17 @@ fn init_tracing(verbosity: u8) {
         .init();
 }
 
+/// Resolve the `--jobs` value, falling back to the `PROTO_IMPORTER_JOBS` env var
+fn build_jobs(jobs: Option<usize>) -> usize {
+    resolve_jobs(jobs, std::env::var("PROTO_IMPORTER_JOBS").ok().as_deref())
+}
+
+/// `--jobs` if given, else a parsable `PROTO_IMPORTER_JOBS` value, else 1
+fn resolve_jobs(jobs: Option<usize>, env_jobs: Option<&str>) -> usize {
+    jobs.or_else(|| env_jobs.and_then(|v| v.trim().parse().ok()))
+        .unwrap_or(1)
+}
+
 pub fn run_cli() -> Result<()> {
     let cli = Cli::parse();
     init_tracing(cli.verbose);
@@ -65,7 +80,8 @@ pub fn run_cli() -> Result<()> {
             pyproject,
             no_verify,
             postprocess_only,
-        } => commands::build(pyproject.as_deref(), no_verify, postprocess_only)?,
+            jobs,
+        } => commands::build_many(&pyproject, no_verify, postprocess_only, build_jobs(jobs))?,
         Commands::Check { pyproject } => commands::check(pyproject.as_deref())?,
         Commands::Clean { pyproject, yes } => commands::clean(pyproject.as_deref(), yes)?,
     }
@@ -90,9 +106,62 @@ where
             pyproject,
             no_verify,
             postprocess_only,
-        } => commands::build(pyproject.as_deref(), no_verify, postprocess_only)?,
+            jobs,
+        } => commands::build_many(&pyproject, no_verify, postprocess_only, build_jobs(jobs))?,
         Commands::Check { pyproject } => commands::check(pyproject.as_deref())?,
         Commands::Clean { pyproject, yes } => commands::clean(pyproject.as_deref(), yes)?,
     }
     Ok(())
 }
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    fn parse_build_pyprojects(args: &[&str]) -> Vec<String> {
+        let cli = Cli::parse_from(["proto-importer", "build"].iter().chain(args));
+        match cli.command {
+            Commands::Build { pyproject, .. } => pyproject,
+            other => panic!("expected build command, got {:?}", other),
+        }
+    }
+
+    #[test]
+    fn test_build_repeated_pyproject_keeps_order() {
+        let pyprojects =
+            parse_build_pyprojects(&["--pyproject", "b.toml", "--pyproject", "a.toml"]);
+        assert_eq!(pyprojects, vec!["b.toml", "a.toml"]);
+    }
+
+    #[test]
+    fn test_build_single_pyproject() {
+        let pyprojects = parse_build_pyprojects(&["--pyproject", "custom.toml"]);
+        assert_eq!(pyprojects, vec!["custom.toml"]);
+    }
+
+    #[test]
+    fn test_build_without_pyproject() {
+        assert!(parse_build_pyprojects(&[]).is_empty());
+    }
+
+    #[test]
+    fn test_resolve_jobs_prefers_flag() {
+        assert_eq!(resolve_jobs(Some(3), Some("8")), 3);
+    }
+
+    #[test]
+    fn test_resolve_jobs_env_fallback() {
+        assert_eq!(resolve_jobs(None, Some("4")), 4);
+    }
+
+    #[test]
+    fn test_resolve_jobs_unparsable_env() {
+        assert_eq!(resolve_jobs(None, Some("many")), 1);
+        assert_eq!(resolve_jobs(None, Some("")), 1);
+    }
+
+    #[test]
+    fn test_resolve_jobs_default() {
+        assert_eq!(resolve_jobs(None, None), 1);
+    }
+}
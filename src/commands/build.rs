@@ -8,6 +8,7 @@ use crate::postprocess::rel_imports::scan_and_report;
 use crate::verification::import_test::verify;
 use anyhow::{Context, Result};
 use std::path::Path;
+use std::sync::atomic::{AtomicBool, AtomicUsize, Ordering};
 
 /// Execute the build command to generate Python code from proto files.
 ///
@@ -120,3 +121,196 @@ pub fn build(pyproject: Option<&str>, no_verify: bool, _postprocess_only: bool)
     }
     Ok(())
 }
+
+/// Execute the build command for several configuration files in one process.
+///
+/// Each config is built with [`build`], so a single invocation can replace
+/// one process per config (e.g. in a monorepo or a test matrix). With
+/// `jobs > 1`, up to `jobs` threads build configs at the same time; each
+/// thread picks up the next unstarted config as soon as its current one is
+/// done, so one slow config does not hold back the rest. An empty slice builds
+/// the default `pyproject.toml`.
+///
+/// # Arguments
+///
+/// * `pyprojects` - Paths to the pyproject.toml files to build
+/// * `no_verify` - If true, skips the verification step for every config
+/// * `postprocess_only` - If true, skips generation for every config (experimental)
+/// * `jobs` - Maximum number of configs built concurrently (0 is treated as 1)
+///
+/// # Returns
+///
+/// Returns `Ok(())` once every config has been built, or the error of the
+/// first failing config in argument order. Configs after a failing one are
+/// not started, though configs already running alongside it still finish.
+///
+/// # Example
+///
+/// ```no_run
+/// use python_proto_importer::commands::build_many;
+///
+/// // Build two configs, both at once
+/// build_many(&["a.toml".to_string(), "b.toml".to_string()], false, false, 2)?;
+/// # Ok::<(), anyhow::Error>(())
+/// ```
+pub fn build_many(
+    pyprojects: &[String],
+    no_verify: bool,
+    postprocess_only: bool,
+    jobs: usize,
+) -> Result<()> {
+    if pyprojects.is_empty() {
+        return build(None, no_verify, postprocess_only);
+    }
+    let build_one = &|pyproject: &String| {
+        // Tag the config's log lines, which interleave when built in parallel
+        let _span = tracing::info_span!("build", config = %pyproject).entered();
+        build(Some(pyproject.as_str()), no_verify, postprocess_only)
+            .with_context(|| format!("build failed for {}", pyproject))
+    };
+    let workers = jobs.clamp(1, pyprojects.len());
+    if workers == 1 {
+        return pyprojects.iter().try_for_each(build_one);
+    }
+
+    // Configs write to their own output directories, so they can be built
+    // side by side. Workers share the index of the next config to start.
+    let next = AtomicUsize::new(0);
+    let failed = AtomicBool::new(false);
+    let mut outcomes: Vec<(usize, Result<()>)> = std::thread::scope(|scope| {
+        let handles: Vec<_> = (0..workers)
+            .map(|_| {
+                scope.spawn(|| {
+                    let mut done = Vec::new();
+                    while !failed.load(Ordering::Relaxed) {
+                        let index = next.fetch_add(1, Ordering::Relaxed);
+                        let Some(pyproject) = pyprojects.get(index) else {
+                            break;
+                        };
+                        let outcome = build_one(pyproject);
+                        if outcome.is_err() {
+                            failed.store(true, Ordering::Relaxed);
+                        }
+                        done.push((index, outcome));
+                    }
+                    done
+                })
+            })
+            .collect();
+        handles
+            .into_iter()
+            .flat_map(|handle| handle.join().expect("build thread panicked"))
+            .collect()
+    });
+    // Configs are started in argument order, so every config before a failing
+    // one has run: the first error by index is the first failing config
+    outcomes.sort_by_key(|(index, _)| *index);
+    outcomes.into_iter().map(|(_, outcome)| outcome).collect()
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use std::fs;
+    use tempfile::TempDir;
+
+    /// Write a config that builds in postprocess-only mode (no protoc needed)
+    fn create_test_config_file(dir: &Path, name: &str, out_dir: &Path) -> String {
+        let config_file = dir.join(name);
+        fs::write(
+            &config_file,
+            format!(
+                "[tool.python_proto_importer]\nout = \"{}\"\n",
+                out_dir.to_string_lossy()
+            ),
+        )
+        .unwrap();
+        config_file.to_string_lossy().to_string()
+    }
+
+    fn create_out_dir(dir: &Path, name: &str) -> std::path::PathBuf {
+        let out_dir = dir.join(name);
+        fs::create_dir(&out_dir).unwrap();
+        out_dir
+    }
+
+    #[test]
+    fn test_build_many_reports_first_failing_config() {
+        let temp_dir = TempDir::new().unwrap();
+        let configs: Vec<String> = ["first.toml", "second.toml"]
+            .iter()
+            .map(|name| temp_dir.path().join(name).to_string_lossy().to_string())
+            .collect();
+
+        // Both configs are missing and built at the same time
+        let result = build_many(&configs, true, true, 2);
+
+        assert!(result.is_err());
+        assert_eq!(
+            result.unwrap_err().to_string(),
+            format!("build failed for {}", configs[0])
+        );
+    }
+
+    #[test]
+    fn test_build_many_builds_every_config_in_parallel() {
+        let temp_dir = TempDir::new().unwrap();
+        let out_dirs: Vec<_> = ["a", "b", "c"]
+            .iter()
+            .map(|name| create_out_dir(temp_dir.path(), name))
+            .collect();
+        let configs: Vec<String> = out_dirs
+            .iter()
+            .enumerate()
+            .map(|(i, out_dir)| {
+                create_test_config_file(temp_dir.path(), &format!("{}.toml", i), out_dir)
+            })
+            .collect();
+
+        let result = build_many(&configs, true, true, 2);
+
+        assert!(result.is_ok());
+        for out_dir in &out_dirs {
+            assert!(out_dir.join("__init__.py").exists());
+        }
+    }
+
+    #[test]
+    fn test_build_many_zero_jobs_builds_sequentially() {
+        let temp_dir = TempDir::new().unwrap();
+        let out_dir = create_out_dir(temp_dir.path(), "output");
+        let configs = vec![
+            temp_dir
+                .path()
+                .join("missing.toml")
+                .to_string_lossy()
+                .to_string(),
+            create_test_config_file(temp_dir.path(), "valid.toml", &out_dir),
+        ];
+
+        // jobs = 0 is treated as 1: the first failure stops the run
+        let result = build_many(&configs, true, true, 0);
+
+        assert!(result.is_err());
+        assert!(result.unwrap_err().to_string().contains("missing.toml"));
+        assert!(!out_dir.join("__init__.py").exists()); // Second config never ran
+    }
+
+    #[test]
+    fn test_build_many_empty_builds_default_config() {
+        let temp_dir = TempDir::new().unwrap();
+        let out_dir = create_out_dir(temp_dir.path(), "output");
+        create_test_config_file(temp_dir.path(), "pyproject.toml", &out_dir);
+
+        let _cwd = crate::utils::CWD_LOCK
+            .lock()
+            .unwrap_or_else(|e| e.into_inner());
+        let original_dir = std::env::current_dir().unwrap();
+        std::env::set_current_dir(&temp_dir).unwrap();
+        let result = build_many(&[], true, true, 4);
+        std::env::set_current_dir(&original_dir).unwrap();
+
+        assert!(result.is_ok());
+        assert!(out_dir.join("__init__.py").exists());
+    }
+}
@@ -2,6 +2,6 @@ pub mod build;
 pub mod check;
 pub mod clean;
 
-pub use build::build;
+pub use build::{build, build_many};
 pub use check::check;
 pub use clean::clean;
@@ -474,6 +474,9 @@ inputs = ["proto/**/*.proto"]
     #[test]
     fn load_default_path() {
         let dir = tempdir().unwrap();
+        let _cwd = crate::utils::CWD_LOCK
+            .lock()
+            .unwrap_or_else(|e| e.into_inner());
         let original_dir = std::env::current_dir().unwrap();
         std::env::set_current_dir(&dir).unwrap();
 
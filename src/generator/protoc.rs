@@ -352,6 +352,9 @@ mod tests {
         config.include = vec![std::path::PathBuf::from("./proto")];
         config.inputs = vec!["proto/**/*.proto".to_string()];
 
+        let _cwd = crate::utils::CWD_LOCK
+            .lock()
+            .unwrap_or_else(|e| e.into_inner());
         // Change to test directory
         let original_dir = std::env::current_dir().unwrap();
         std::env::set_current_dir(&dir).unwrap();
@@ -14,6 +14,11 @@ pub fn run_cmd(cmd: &[String]) -> Result<()> {
     Ok(())
 }
 
+/// Held by tests that change the working directory, which is shared by the
+/// whole test process
+#[cfg(test)]
+pub(crate) static CWD_LOCK: std::sync::Mutex<()> = std::sync::Mutex::new(());
+
 #[cfg(test)]
 mod tests {
     use super::*;
@@ -4,7 +4,9 @@ use crate::verification::{
     create_import_test_script, determine_package_structure, determine_package_structure_legacy,
 };
 use anyhow::{Context, Result};
+use std::collections::hash_map::DefaultHasher;
 use std::ffi::OsStr;
+use std::hash::{Hash, Hasher};
 use std::path::Path;
 use walkdir::WalkDir;
 
@@ -68,9 +70,13 @@ pub fn verify(cfg: &AppConfig) -> Result<()> {
         if tracing::enabled!(tracing::Level::DEBUG)
             && let Ok(temp_dir) = std::env::temp_dir().canonicalize()
         {
+            // Keyed on the output dir too: configs built in parallel share the pid
+            let mut hasher = DefaultHasher::new();
+            out_abs.hash(&mut hasher);
             let script_path = temp_dir.join(format!(
-                "python_proto_importer_test_{}.py",
-                std::process::id()
+                "python_proto_importer_test_{}_{:016x}.py",
+                std::process::id(),
+                hasher.finish()
             ));
             if let Err(e) = std::fs::write(&script_path, &test_script) {
                 tracing::debug!(